@@ -1,26 +1,62 @@
 """
-Antigravity Quota Monitor — Flask backend
+Antigravity Quota Monitor — Quart backend
 Detects the Antigravity Language Server process, proxies the GetUserStatus API
 over HTTP/2, and serves a web dashboard showing model quota usage.
+
+All I/O is async so concurrent dashboard polls share one event loop; run with
+`python app.py` or `hypercorn app:app`.
 """
 
-import json
+import asyncio
+import functools
+import gzip
+import hashlib
 import logging
+import operator
 import platform
-import re
 import socket
+import sys
+import time
 import warnings
-from datetime import datetime, timezone
+from collections import defaultdict
+from datetime import datetime
 
 import httpx
 import psutil
-from flask import Flask, jsonify, render_template
+from quart import Quart, render_template, request
+
+try:
+    import orjson
+except ImportError:  # optional speedup — fall back to the stdlib encoder/decoder
+    import json as orjson
 
 # ─── Configuration ─────────────────────────────────────────────────────────────
 
 APP_PORT = 5050
 LS_TIMEOUT = 30.0
+LS_PROBE_TIMEOUT = 1.0  # localhost port probes; a healthy LS answers well within this
+# Probes queue for a free pool slot without a deadline: each slot holder gives up
+# within LS_PROBE_TIMEOUT, so a port stuck behind stalled ones still gets tried
+_PROBE_TIMEOUT = httpx.Timeout(LS_PROBE_TIMEOUT, pool=None)
+LS_LIVENESS_TIMEOUT = 0.1  # TCP connect check before discarding a cached connection
+LS_KEEPALIVE_EXPIRY = 3600.0  # keep the single localhost HTTP/2 connection pinned
 LS_SERVICE = "exa.language_server_pb.LanguageServerService"
+QUOTA_REFRESH_INTERVAL = 5.0  # seconds between background GetUserStatus polls
+QUOTA_IDLE_TIMEOUT = 120.0  # pause background polls after this long without a dashboard poll
+
+# Headers sent with every Language Server request (set once on the client;
+# only the per-connection CSRF token is added per call)
+_BASE_LS_HEADERS = {"Content-Type": "application/json", "Connect-Protocol-Version": "1"}
+
+# Static request bodies, serialised once (Content-Type comes from _BASE_LS_HEADERS)
+_UNLEASH_DATA_BODY = orjson.dumps({"wrapper_data": {}})
+_USER_STATUS_BODY = orjson.dumps({
+    "metadata": {
+        "ideName": "antigravity",
+        "extensionName": "antigravity",
+        "locale": "en",
+    }
+})
 
 # Process name patterns per platform
 _LS_PROCESS_NAMES = {
@@ -28,6 +64,13 @@ _LS_PROCESS_NAMES = {
     "Darwin": "language_server_macos",
     "Windows": "language_server_windows",
 }
+_LS_NAME = _LS_PROCESS_NAMES.get(platform.system(), "language_server")
+
+# Label substrings that identify a model family, checked in order
+_FAMILIES = (("claude", "Claude"), ("gemini", "Gemini"), ("gpt", "GPT"))
+
+# datetime.fromisoformat() only understands a trailing "Z" from Python 3.11
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
 
 # ─── Logging ───────────────────────────────────────────────────────────────────
 
@@ -37,9 +80,9 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
-# ─── Flask app ─────────────────────────────────────────────────────────────────
+# ─── Quart app ─────────────────────────────────────────────────────────────────
 
-app = Flask(__name__)
+app = Quart(__name__)
 
 
 # ─── Connection manager ────────────────────────────────────────────────────────
@@ -49,52 +92,98 @@ class ConnectionManager:
 
     def __init__(self):
         self._connection: dict | None = None
-        self._client: httpx.Client | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._last_pid: int | None = None
+        self._detect_lock = asyncio.Lock()
 
     @property
-    def client(self) -> httpx.Client:
+    def client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.Client(http2=True, verify=False, timeout=LS_TIMEOUT)
+            self._client = httpx.AsyncClient(
+                http2=True,
+                verify=False,
+                timeout=LS_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=4,
+                    max_keepalive_connections=4,
+                    keepalive_expiry=LS_KEEPALIVE_EXPIRY,
+                ),
+                headers=_BASE_LS_HEADERS,
+            )
         return self._client
 
-    def reset(self):
+    async def reset(self):
         """Close and discard the client and cached connection."""
         if self._client:
             try:
-                self._client.close()
+                await self._client.aclose()
             except Exception:
                 pass
         self._client = None
         self._connection = None
         log.info("ConnectionManager reset (stale connection discarded)")
 
-    def get_connection(self) -> dict | None:
+    async def get_connection(self) -> dict | None:
         """Return cached connection, detecting if necessary."""
         if not self._connection:
-            self._connection = detect_language_server(self)
+            # Concurrent requests wait for a single detection instead of each scanning
+            async with self._detect_lock:
+                if not self._connection:
+                    self._connection = (
+                        await self._revalidate_pid() or await detect_language_server(self)
+                    )
+                    if self._connection:
+                        self._last_pid = self._connection["pid"]
         return self._connection
 
+    async def _revalidate_pid(self) -> dict | None:
+        """Reconnect to the last known Language Server PID without a full process scan."""
+        if self._last_pid is None:
+            return None
+        try:
+            proc, cmdline = await asyncio.to_thread(_lookup_process, self._last_pid)
+            connection = await _connect_to_process(self, proc, cmdline)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            connection = None
+        if connection:
+            log.info("Revalidated Language Server pid=%s", self._last_pid)
+        return connection
+
     def invalidate_connection(self):
         self._connection = None
 
 
 _mgr = ConnectionManager()
 
+# Latest /api/quota response, kept fresh by _refresh_loop. Only the event loop
+# touches it and updates never await midway, so no lock is needed.
+_snapshot = {"raw": None, "body": None, "gzip": None, "etag": None, "error": None}
+_snapshot_ready = asyncio.Event()  # cleared while the refresh loop is paused
+_quota_wanted = asyncio.Event()  # set by /api/quota to wake a paused refresh loop
+_last_quota_request = 0.0  # time.monotonic() of the latest /api/quota hit
+_refresh_task: asyncio.Task | None = None
+
 
 # ─── Helpers ───────────────────────────────────────────────────────────────────
 
-def _ls_headers(csrf_token: str) -> dict:
-    """Return the standard headers for Language Server API requests."""
-    return {
-        "Content-Type": "application/json",
-        "Connect-Protocol-Version": "1",
-        "X-Codeium-Csrf-Token": csrf_token,
-    }
+def _jsonify(obj):
+    """Serialise *obj* into a JSON response (orjson when available)."""
+    return app.response_class(orjson.dumps(obj), mimetype="application/json")
 
 
-def _quota_sort_key(x: dict):
-    """Sort key: exhausted pools/models first, then by used percentage descending."""
-    return (not x["is_exhausted"], -(x["used_percentage"] or 0))
+async def _is_still_alive(connection: dict) -> bool:
+    """Cheap check that a cached Language Server PID still exists and its port accepts TCP."""
+    if not psutil.pid_exists(connection["pid"]):
+        return False
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection("127.0.0.1", connection["port"]),
+            LS_LIVENESS_TIMEOUT,
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
 
 
 def get_ip() -> str:
@@ -111,101 +200,153 @@ def get_ip() -> str:
 
 # ─── Language Server detection ─────────────────────────────────────────────────
 
-def detect_language_server(mgr: ConnectionManager) -> dict | None:
+async def detect_language_server(mgr: ConnectionManager) -> dict | None:
     """Detect the Antigravity Language Server process and extract connection params.
 
     Uses psutil for cross-platform process detection (Linux, macOS, Windows).
+    The blocking process scan runs in a worker thread to keep the event loop free.
     """
-    os_name = platform.system()
-    ls_name = _LS_PROCESS_NAMES.get(os_name, "language_server")
-    log.info("Scanning for Language Server process: %s", ls_name)
+    log.info("Scanning for Language Server process: %s", _LS_NAME)
 
-    for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+    for proc, cmdline in await asyncio.to_thread(_scan_ls_processes):
         try:
-            name = proc.info["name"] or ""
-            cmdline = proc.info["cmdline"] or []
-            cmd_str = " ".join(cmdline)
+            connection = await _connect_to_process(mgr, proc, cmdline)
+            if connection:
+                return connection
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+
+    log.warning("Language Server not found")
+    return None
 
-            if ls_name not in name and ls_name not in cmd_str:
-                continue
-            if "--extension_server_port" not in cmd_str:
-                continue
 
-            pid = proc.info["pid"]
+def _scan_ls_processes() -> list:
+    """Return (process, cmdline) pairs for every process named like the Language Server."""
+    # psutil >= 6.0 caches Process instances between process_iter() calls;
+    # drop them so a restarted Language Server is always picked up fresh.
+    psutil.process_iter.cache_clear()
+    # Only fetch the name up front; cmdline is read for matching processes only.
+    # (psutil already restores names truncated by the kernel from argv[0].)
+    candidates = []
+    for proc in psutil.process_iter(["pid", "name"]):
+        try:
+            if _LS_NAME in (proc.info["name"] or ""):
+                candidates.append((proc, proc.cmdline()))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            continue
+    return candidates
 
-            token_match = re.search(r"--csrf_token[=\s]+([a-zA-Z0-9\-]+)", cmd_str)
-            port_match = re.search(r"--extension_server_port[=\s]+(\d+)", cmd_str)
 
-            if not token_match:
-                continue
+def _lookup_process(pid: int) -> tuple[psutil.Process, list]:
+    """Return the process and cmdline for a PID (blocking; run in a worker thread)."""
+    proc = psutil.Process(pid)
+    return proc, proc.cmdline()
 
-            csrf_token = token_match.group(1)
-            extension_port = int(port_match.group(1)) if port_match else 0
 
-            ports = []
-            try:
-                for conn in proc.net_connections(kind="inet"):
-                    if conn.status == psutil.CONN_LISTEN:
-                        p = conn.laddr.port
-                        if p not in ports:
-                            ports.append(p)
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                pass
+def _parse_ls_args(cmdline: list) -> tuple[str | None, int | None]:
+    """Scan argv for the CSRF token and extension server port.
+
+    Accepts both --flag=value and --flag value forms. The port is None when
+    --extension_server_port is absent altogether.
+    """
+    csrf_token = None
+    extension_port = None
+    args = iter(cmdline)
+    for arg in args:
+        flag, sep, value = arg.partition("=")
+        if flag == "--csrf_token":
+            csrf_token = value if sep else next(args, None)
+        elif flag == "--extension_server_port":
+            value = value if sep else next(args, "")
+            extension_port = int(value) if value.isdecimal() else 0
+    return csrf_token, extension_port
+
+
+def _listening_ports(proc: psutil.Process) -> list:
+    """Return the sorted TCP ports a process is listening on."""
+    # kind="tcp" skips the UDP socket tables that "inet" would also read
+    try:
+        return sorted({
+            conn.laddr.port
+            for conn in proc.net_connections(kind="tcp")
+            if conn.status == psutil.CONN_LISTEN
+        })
+    except (psutil.AccessDenied, psutil.NoSuchProcess):
+        return []
 
-            ports.sort()
-            log.info("Found Language Server pid=%s, testing ports: %s", pid, ports)
 
-            for port in ports:
-                if _test_port(mgr, port, csrf_token):
-                    connection = {
-                        "port": port,
-                        "csrf_token": csrf_token,
-                        "pid": pid,
-                        "extension_port": extension_port,
-                    }
-                    log.info("Connected to Language Server on port %s", port)
-                    return connection
+async def _connect_to_process(mgr: ConnectionManager, proc: psutil.Process, cmdline: list) -> dict | None:
+    """Extract connection params from a Language Server process and find its API port."""
+    csrf_token, extension_port = _parse_ls_args(cmdline)
+    if extension_port is None or not csrf_token:
+        return None
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
+    ports = await asyncio.to_thread(_listening_ports, proc)
+    log.info("Found Language Server pid=%s, testing ports: %s", proc.pid, ports)
 
-    log.warning("Language Server not found")
+    port = await _find_api_port(mgr.client, ports, csrf_token) if ports else None
+    if port is None:
+        return None
+
+    log.info("Connected to Language Server on port %s", port)
+    return {
+        "port": port,
+        "csrf_token": csrf_token,
+        "pid": proc.pid,
+        "extension_port": extension_port,
+    }
+
+
+async def _find_api_port(client: httpx.AsyncClient, ports: list, csrf_token: str) -> int | None:
+    """Probe all candidate ports concurrently and return the first one that answers."""
+    tasks = [asyncio.create_task(_test_port(client, port, csrf_token)) for port in ports]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            port = await next_done
+            if port is not None:
+                return port
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     return None
 
 
-def _test_port(mgr: ConnectionManager, port: int, csrf_token: str) -> bool:
-    """Test if a port responds to the Language Server API via HTTP/2."""
+async def _test_port(client: httpx.AsyncClient, port: int, csrf_token: str) -> int | None:
+    """Test if a port responds to the Language Server API via HTTP/2.
+
+    Only the status line and headers are inspected; the body is never read.
+    Returns the port on success so concurrent probes can report which one won.
+    """
     try:
-        resp = mgr.client.post(
+        async with client.stream(
+            "POST",
             f"https://127.0.0.1:{port}/{LS_SERVICE}/GetUnleashData",
-            json={"wrapper_data": {}},
-            headers=_ls_headers(csrf_token),
-        )
-        if resp.status_code == 200:
-            resp.json()  # Validate JSON
-            return True
+            content=_UNLEASH_DATA_BODY,
+            headers={"X-Codeium-Csrf-Token": csrf_token, "Accept": "application/json"},
+            timeout=_PROBE_TIMEOUT,
+        ) as resp:
+            if (
+                resp.status_code == 200
+                and resp.headers.get("content-type", "").startswith("application/json")
+            ):
+                return port
     except Exception as e:
         log.debug("Port %s test failed: %s", port, e)
-    return False
+    return None
 
 
 # ─── Quota fetching ────────────────────────────────────────────────────────────
 
-def fetch_quota(mgr: ConnectionManager, connection: dict) -> dict:
-    """Fetch quota data from the Language Server's GetUserStatus API via HTTP/2."""
-    resp = mgr.client.post(
+async def fetch_quota(mgr: ConnectionManager, connection: dict) -> bytes:
+    """Fetch the raw GetUserStatus response body from the Language Server via HTTP/2."""
+    resp = await mgr.client.post(
         f"https://127.0.0.1:{connection['port']}/{LS_SERVICE}/GetUserStatus",
-        json={
-            "metadata": {
-                "ideName": "antigravity",
-                "extensionName": "antigravity",
-                "locale": "en",
-            }
-        },
-        headers=_ls_headers(connection["csrf_token"]),
+        content=_USER_STATUS_BODY,
+        headers={"X-Codeium-Csrf-Token": connection["csrf_token"]},
     )
     resp.raise_for_status()
-    return resp.json()
+    return resp.content
 
 
 # ─── Quota parsing ─────────────────────────────────────────────────────────────
@@ -227,6 +368,54 @@ def _parse_credit_block(monthly_raw, available_raw) -> dict | None:
     }
 
 
+@functools.lru_cache(maxsize=256)
+def _reset_epoch_ms(reset_time_str: str) -> int | None:
+    """Parse an RFC 3339 reset time into epoch milliseconds (None if unparseable).
+
+    Memoised: models in a pool share a reset time, and it repeats across polls.
+    Times without a UTC offset are ambiguous and treated as unparseable.
+    """
+    iso = reset_time_str
+    if not _FROMISOFORMAT_ACCEPTS_Z and iso.endswith("Z"):
+        iso = iso[:-1] + "+00:00"
+    try:
+        reset_time = datetime.fromisoformat(iso)
+    except ValueError:
+        return None
+    if reset_time.tzinfo is None:
+        return None
+    return int(reset_time.timestamp() * 1000)
+
+
+def _parse_model_quota(m: dict) -> dict:
+    """Parse a single model config (with quotaInfo) into a normalised dict."""
+    quota_info = m["quotaInfo"]
+    remaining_fraction = quota_info.get("remainingFraction")
+    reset_time_str = quota_info.get("resetTime", "")
+    if not isinstance(reset_time_str, str):  # malformed; also keeps the pool key hashable
+        reset_time_str = ""
+
+
+    if remaining_fraction is None:
+        remaining_pct = used_pct = None
+        is_exhausted = False
+    else:
+        remaining_pct = round(remaining_fraction * 100, 1)
+        used_pct = round((1 - remaining_fraction) * 100, 1)
+        is_exhausted = remaining_fraction == 0
+
+    return {
+        "label": m.get("label", "Unknown"),
+        "model_id": m.get("modelOrAlias", {}).get("model", "unknown"),
+        "remaining_fraction": remaining_fraction,
+        "remaining_percentage": remaining_pct,
+        "used_percentage": used_pct,
+        "is_exhausted": is_exhausted,
+        "reset_time_iso": reset_time_str,
+        "reset_epoch_ms": _reset_epoch_ms(reset_time_str),
+    }
+
+
 def parse_quota_response(data: dict) -> dict:
     """Parse the raw GetUserStatus response into a clean format."""
     user_status = data.get("userStatus", {})
@@ -247,58 +436,19 @@ def parse_quota_response(data: dict) -> dict:
         user_status.get("cascadeModelConfigData", {}).get("clientModelConfigs", [])
     )
 
-    models = []
-    now = datetime.now(timezone.utc)
-
-    for m in raw_models:
-        quota_info = m.get("quotaInfo")
-        if not quota_info:
-            continue
-
-        remaining_fraction = quota_info.get("remainingFraction")
-        reset_time_str = quota_info.get("resetTime", "")
-
-        try:
-            reset_time = datetime.fromisoformat(reset_time_str.replace("Z", "+00:00"))
-            time_until_reset_ms = int((reset_time - now).total_seconds() * 1000)
-        except Exception:
-            time_until_reset_ms = 0
-
-        remaining_pct = (
-            round(remaining_fraction * 100, 1)
-            if remaining_fraction is not None
-            else None
-        )
-        used_pct = (
-            round((1 - remaining_fraction) * 100, 1)
-            if remaining_fraction is not None
-            else None
-        )
-
-        models.append({
-            "label": m.get("label", "Unknown"),
-            "model_id": m.get("modelOrAlias", {}).get("model", "unknown"),
-            "remaining_fraction": remaining_fraction,
-            "remaining_percentage": remaining_pct,
-            "used_percentage": used_pct,
-            "is_exhausted": (remaining_fraction == 0) if remaining_fraction is not None else False,
-            "reset_time_iso": reset_time_str,
-            "time_until_reset_ms": time_until_reset_ms,
-        })
-
-    models.sort(key=_quota_sort_key)
-
     # Group models into quota pools (same reset_time + remaining_fraction = same pool)
-    pool_map: dict[str, list] = {}
-    for m in models:
-        pool_key = f"{m['reset_time_iso']}|{m['remaining_fraction']}"
-        pool_map.setdefault(pool_key, []).append(m)
+    pool_map: dict[tuple, list] = defaultdict(list)
+    for m in raw_models:
+        if m.get("quotaInfo"):
+            entry = _parse_model_quota(m)
+            pool_map[(entry["reset_time_iso"], entry["remaining_fraction"])].append(entry)
 
     pools = []
     for pool_models in pool_map.values():
+        pool_models.sort(key=operator.itemgetter("label"))
         first = pool_models[0]
         pools.append({
-            "name": _derive_pool_name([m["label"] for m in pool_models]),
+            "name": _derive_pool_name(tuple(m["label"] for m in pool_models)),
             "models": pool_models,
             "model_count": len(pool_models),
             "remaining_fraction": first["remaining_fraction"],
@@ -306,13 +456,20 @@ def parse_quota_response(data: dict) -> dict:
             "used_percentage": first["used_percentage"],
             "is_exhausted": first["is_exhausted"],
             "reset_time_iso": first["reset_time_iso"],
-            "time_until_reset_ms": first["time_until_reset_ms"],
+            "reset_epoch_ms": first["reset_epoch_ms"],
+            # Display order: exhausted first, then by used percentage descending
+            "_sort": (not first["is_exhausted"], -(first["used_percentage"] or 0)),
         })
 
-    pools.sort(key=_quota_sort_key)
+    pools.sort(key=operator.itemgetter("_sort"))
+    for pool in pools:
+        del pool["_sort"]
+
+    # Every model in a pool shares the pool's sort key, so flattening the
+    # sorted pools yields the models in display order without a second sort.
+    models = [m for pool in pools for m in pool["models"]]
 
     return {
-        "timestamp": now.isoformat(),
         "plan_name": plan_info.get("planName", "Unknown"),
         "plan_tier": plan_info.get("teamsTier", ""),
         "prompt_credits": prompt_credits,
@@ -324,22 +481,16 @@ def parse_quota_response(data: dict) -> dict:
     }
 
 
-def _derive_pool_name(labels: list) -> str:
-    """Derive a descriptive pool name from a list of model labels."""
+@functools.lru_cache(maxsize=128)
+def _derive_pool_name(labels: tuple) -> str:
+    """Derive a descriptive pool name from a tuple of model labels.
+
+    Memoised: the same label sets recur on every poll.
+    """
     if len(labels) == 1:
         return labels[0]
 
-    families = set()
-    for label in labels:
-        lower = label.lower()
-        if "claude" in lower:
-            families.add("Claude")
-        elif "gemini" in lower:
-            families.add("Gemini")
-        elif "gpt" in lower:
-            families.add("GPT")
-        else:
-            families.add(label.split()[0])
+    families = {_label_family(label) for label in labels}
 
     if len(families) == 1:
         return f"{list(families)[0]} Models"
@@ -350,38 +501,148 @@ def _derive_pool_name(labels: list) -> str:
     return "Premium Models"
 
 
-# ─── Flask routes ──────────────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=256)
+def _label_family(label: str) -> str:
+    """Return the model family for a label (Claude/Gemini/GPT, else its first word)."""
+    lower = label.lower()
+    family = next((name for marker, name in _FAMILIES if marker in lower), None)
+    return family or label.split()[0]
 
-@app.route("/")
-def index():
-    return render_template("index.html")
 
+# ─── Background refresh ────────────────────────────────────────────────────────
 
-@app.route("/api/quota")
-def api_quota():
-    connection = _mgr.get_connection()
+def _store_snapshot(raw: bytes):
+    """Parse and serialise a GetUserStatus body into the snapshot.
 
-    if not connection:
-        return (
-            jsonify({"error": "Language Server not found. Is Antigravity running?"}),
-            503,
+    The payload carries no time-relative fields, so while the Language Server
+    returns identical bytes the snapshot (body, gzip and ETag) is kept as is.
+    """
+    if raw != _snapshot["raw"]:
+        body = orjson.dumps(parse_quota_response(orjson.loads(raw)))
+        if isinstance(body, str):  # stdlib json fallback
+            body = body.encode()
+        _snapshot.update(
+            raw=raw,
+            body=body,
+            # mtime=0 keeps the gzip bytes a pure function of the body
+            gzip=gzip.compress(body, compresslevel=6, mtime=0),
+            etag=hashlib.blake2b(body, digest_size=16).hexdigest(),
         )
+    _snapshot["error"] = None
+
+
+def _store_snapshot_error(message: str, status: int):
+    _snapshot["error"] = ({"error": message}, status)
+
+
+async def _refresh_snapshot():
+    """Fetch and parse the latest quota into the snapshot, recording any error."""
+    connection = await _mgr.get_connection()
+
+    if not connection:
+        _store_snapshot_error("Language Server not found. Is Antigravity running?", 503)
+        return
 
     try:
-        raw_data = fetch_quota(_mgr, connection)
-        return jsonify(parse_quota_response(raw_data))
+        raw_data = await fetch_quota(_mgr, connection)
+        _store_snapshot(raw_data)
     except Exception as e:
-        log.warning("Quota fetch failed (%s), resetting and retrying: %s", type(e).__name__, e)
-        _mgr.reset()
-        connection = _mgr.get_connection()
-        if not connection:
-            return jsonify({"error": f"Quota fetch failed: {e}"}), 500
+        # httpx drops broken connections from its pool on its own, so keep the
+        # client (and any healthy HTTP/2 connection). Most failures are transient
+        # (e.g. a reset stream) — only re-detect if the Language Server is gone.
+        if await _is_still_alive(connection):
+            log.warning("Quota fetch failed (%s), retrying: %s", type(e).__name__, e)
+        else:
+            log.warning("Quota fetch failed (%s), re-detecting and retrying: %s", type(e).__name__, e)
+            _mgr.invalidate_connection()
+            connection = await _mgr.get_connection()
+            if not connection:
+                _store_snapshot_error(f"Quota fetch failed: {e}", 500)
+                return
         try:
-            raw_data = fetch_quota(_mgr, connection)
-            return jsonify(parse_quota_response(raw_data))
+            raw_data = await fetch_quota(_mgr, connection)
+            _store_snapshot(raw_data)
         except Exception as e2:
             log.error("Quota fetch failed after retry: %s", e2)
-            return jsonify({"error": f"Quota fetch failed: {e2}"}), 500
+            _store_snapshot_error(f"Quota fetch failed: {e2}", 500)
+
+
+async def _refresh_loop():
+    """Refresh the snapshot every QUOTA_REFRESH_INTERVAL seconds.
+
+    One loop serves every open dashboard, so the Language Server sees a fixed
+    request rate no matter how many tabs are polling. After QUOTA_IDLE_TIMEOUT
+    without a poll the loop pauses until the next /api/quota request.
+    """
+    while True:
+        try:
+            await _refresh_snapshot()
+        except Exception as e:
+            log.exception("Quota refresh failed")
+            _store_snapshot_error(f"Quota refresh failed: {e}", 500)
+        _snapshot_ready.set()
+        await asyncio.sleep(QUOTA_REFRESH_INTERVAL)
+
+        if time.monotonic() - _last_quota_request > QUOTA_IDLE_TIMEOUT:
+            log.info("No dashboard polls for %.0fs, pausing quota refresh", QUOTA_IDLE_TIMEOUT)
+            # The snapshot goes stale while paused: the next request waits for a refresh
+            _snapshot_ready.clear()
+            _quota_wanted.clear()
+            await _quota_wanted.wait()
+            log.info("Dashboard poll received, resuming quota refresh")
+
+
+# ─── Quart routes ──────────────────────────────────────────────────────────────
+
+@app.before_serving
+async def _start_refresh():
+    # The first refresh also detects the Language Server, so the TLS + HTTP/2
+    # handshake is done before the first dashboard poll. Count startup as a
+    # poll so the loop keeps running for a dashboard opened right after launch.
+    global _refresh_task, _last_quota_request
+    _last_quota_request = time.monotonic()
+    _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+@app.after_serving
+async def _stop_refresh():
+    if _refresh_task:
+        _refresh_task.cancel()
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+    await _mgr.reset()
+
+
+@app.route("/")
+async def index():
+    return await render_template("index.html")
+
+
+@app.route("/api/quota")
+async def api_quota():
+    global _last_quota_request
+    _last_quota_request = time.monotonic()
+    _quota_wanted.set()
+    await _snapshot_ready.wait()
+
+    if _snapshot["error"]:
+        payload, status = _snapshot["error"]
+        return _jsonify(payload), status
+    if _snapshot["body"] is None:
+        return _jsonify({"error": "Quota not available yet"}), 503
+
+    # Serve the snapshot, gzip-compressed when accepted; 304 if the ETag matches
+    # Index by name: "in" ignores quality, so it would match "gzip;q=0" too
+    if request.accept_encodings["gzip"] > 0:
+        resp = app.response_class(_snapshot["gzip"], mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+        resp.set_etag(_snapshot["etag"] + "-gzip")
+    else:
+        resp = app.response_class(_snapshot["body"], mimetype="application/json")
+        resp.set_etag(_snapshot["etag"])
+    resp.headers["Vary"] = "Accept-Encoding"
+    # Always revalidate; the body only changes with the quota itself
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return await resp.make_conditional(request)
 
 
 # ─── Entry point ───────────────────────────────────────────────────────────────
@@ -6,6 +6,7 @@ const POLL_INTERVAL = 60_000;
 let pollTimer = null;
 let quotaData = null;
 let resetTimers = [];
+let serverClockOffset = 0; // server time minus local time, from the response Date header
 let currentView = 'pools'; // 'pools' or 'models'
 
 // ─── Init ──────────────────────────────────────────────────────────────────────
@@ -25,6 +26,9 @@ async function fetchQuota() {
     try {
         const res = await fetch('/api/quota');
         const data = await res.json();
+        // Countdowns use the server clock: LAN devices' clocks may be off
+        const serverDate = Date.parse(res.headers.get('Date'));
+        serverClockOffset = Number.isNaN(serverDate) ? 0 : serverDate - Date.now();
 
         if (data.error) {
             showError(data.error);
@@ -187,7 +191,7 @@ function renderPoolCard(pool, index) {
         <div class="pool-card__bar-fill pool-card__bar-fill--${colorSuffix}" style="width: ${remaining}%"></div>
       </div>
       <div class="pool-card__meta">
-        <span>⏱ Resets in: <strong id="pool-reset-${index}">${formatCountdown(pool.time_until_reset_ms)}</strong></span>
+        <span>⏱ Resets in: <strong id="pool-reset-${index}">${formatCountdown(msUntilReset(pool))}</strong></span>
       </div>
       <div class="pool-card__models">${chips}</div>
     </div>
@@ -235,7 +239,7 @@ function renderModelCard(model, index) {
       </div>
       <div class="model-card__reset">
         <span class="model-card__reset-icon">⏱</span>
-        <span>Resets in: <strong id="reset-${index}">${formatCountdown(model.time_until_reset_ms)}</strong></span>
+        <span>Resets in: <strong id="reset-${index}">${formatCountdown(msUntilReset(model))}</strong></span>
       </div>
     </div>
   `;
@@ -266,20 +270,21 @@ function renderCreditCard(title, credits, icon) {
 
 /**
  * Start live countdown timers for an array of items (pools or models).
- * @param {Array}  items    - Array with `time_until_reset_ms` and `reset_time_iso`
+ * @param {Array}  items    - Array with `reset_epoch_ms` and `reset_time_iso`
  * @param {string} idPrefix - DOM element ID prefix, e.g. 'pool-reset-' or 'reset-'
  */
 function startCountdownTimers(items, idPrefix) {
     items.forEach((item, i) => {
-        if (item.time_until_reset_ms <= 0) return;
+        const untilReset = msUntilReset(item);
+        if (untilReset <= 0) return;
 
         const resetStr = getRelativeDateString(new Date(item.reset_time_iso));
-        const endTime = Date.now() + item.time_until_reset_ms;
+        const endTime = Date.now() + untilReset;
         const elId = idPrefix + i;
 
         // Set initial value immediately
         const elInit = document.getElementById(elId);
-        if (elInit) elInit.textContent = `${formatCountdown(item.time_until_reset_ms)} (${resetStr})`;
+        if (elInit) elInit.textContent = `${formatCountdown(untilReset)} (${resetStr})`;
 
         const timer = setInterval(() => {
             const remaining = endTime - Date.now();
@@ -296,6 +301,15 @@ function startCountdownTimers(items, idPrefix) {
     });
 }
 
+/**
+ * Milliseconds until an item resets, measured on the server clock.
+ * `reset_epoch_ms` is null when the server could not parse the reset time.
+ */
+function msUntilReset(item) {
+    if (item.reset_epoch_ms == null) return 0;
+    return item.reset_epoch_ms - (Date.now() + serverClockOffset);
+}
+
 function clearResetTimers() {
     resetTimers.forEach(t => clearInterval(t));
     resetTimers = [];